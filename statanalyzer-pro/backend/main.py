@@ -1,30 +1,54 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import pandas as pd
 import numpy as np
-from scipy import stats
-import statsmodels.api as sm
-from io import BytesIO, StringIO
-from typing import Dict, List, Any, Optional
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from scipy import special, stats
+import numba
+from numba import njit, prange
+from typing import BinaryIO, Callable, Dict, List, Any, Literal, Optional, Sequence, Tuple
 from pydantic import BaseModel, Field
-import base64
+import anyio.to_thread
 import os
+import re
 import logging
+import secrets
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
-from sklearn.impute import SimpleImputer, KNNImputer
-from sklearn.preprocessing import StandardScaler, MinMaxScaler
 
 # ============= LOGGING SETUP =============
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ============= FASTAPI APP INITIALIZATION =============
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync handlers and upload parsing all run on anyio's worker threads; size that
+    # pool for CPU-bound numpy/scipy work instead of the fixed default of 40
+    default_size = max(40, (os.cpu_count() or 1) * 4)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.environ.get("THREADPOOL_SIZE", default_size))
+    yield
+
 app = FastAPI(
     title="StatAnalyzer Pro - Enterprise Edition",
     description="Advanced Business Intelligence & Statistical Analysis Platform",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # ============= CORS MIDDLEWARE =============
@@ -36,8 +60,653 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ============= COMPRESSION MIDDLEWARE =============
+# Numeric JSON (correlation matrices, summaries) and the frontend bundle
+# compress well; tiny responses are not worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# ============= NUMERIC KERNELS =============
+
+# Handlers run concurrently in FastAPI's threadpool; numba's fallback threading
+# layer (workqueue) aborts on concurrent parallel calls. Prefer OpenMP (the Docker
+# image ships libgomp) when it loads; otherwise keep numba's own default choice
+# rather than pinning a layer the host may not have.
+if "NUMBA_THREADING_LAYER" not in os.environ:
+    try:
+        from numba.np.ufunc import omppool  # noqa: F401  (ImportError without an OpenMP runtime)
+        numba.config.THREADING_LAYER = "omp"
+    except ImportError:
+        pass
+
+def finite(arr: np.ndarray) -> np.ndarray:
+    """Entries of a float64 array that are neither NaN nor infinite, in one vectorised mask pass."""
+    return arr[np.isfinite(arr)]
+
+@njit(cache=True)
+def central_sums(x):
+    """(count, mean, M2, M3, M4, min, max) of a 1-D float64 array, skipping NaN and ±inf.
+
+    M2..M4 are the sums of squared, cubed and fourth-power deviations from the
+    mean, accumulated in one pass with Welford-style updates.
+    """
+    n = 0.0
+    mean = 0.0
+    M2 = 0.0
+    M3 = 0.0
+    M4 = 0.0
+    lo = np.inf
+    hi = -np.inf
+    for i in range(x.shape[0]):
+        v = x[i]
+        if not np.isfinite(v):
+            continue
+        lo = min(lo, v)
+        hi = max(hi, v)
+        n1 = n
+        n += 1.0
+        delta = v - mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term1 = delta * delta_n * n1
+        mean += delta_n
+        M4 += term1 * delta_n2 * (n * n - 3.0 * n + 3.0) + 6.0 * delta_n2 * M2 - 4.0 * delta_n * M3
+        M3 += term1 * delta_n * (n - 2.0) - 3.0 * delta_n * M2
+        M2 += term1
+    return n, mean, M2, M3, M4, lo, hi
+
+@njit(parallel=True, cache=True)
+def column_moments(X):
+    """Per-column (count, mean, variance, skewness, kurtosis, min, max) of a 2-D float64 array.
+
+    One central_sums pass per column. Variance, skewness and kurtosis follow
+    pandas' bias-corrected definitions (ddof=1, adjusted Fisher-Pearson,
+    excess kurtosis).
+    """
+    n_cols = X.shape[1]
+    out = np.full((n_cols, 7), np.nan)
+    for j in prange(n_cols):
+        n, mean, M2, M3, M4, lo, hi = central_sums(X[:, j])
+        out[j, 0] = n
+        if n >= 1:
+            out[j, 1] = mean
+            out[j, 5] = lo
+            out[j, 6] = hi
+        if n >= 2:
+            out[j, 2] = M2 / (n - 1.0)
+        if n >= 3:
+            out[j, 3] = 0.0 if M2 == 0.0 else n * np.sqrt(n - 1.0) / (n - 2.0) * M3 / M2 ** 1.5
+        if n >= 4:
+            denominator = (n - 2.0) * (n - 3.0) * M2 * M2
+            if denominator == 0.0:
+                out[j, 4] = 0.0
+            else:
+                adj = 3.0 * (n - 1.0) ** 2 / ((n - 2.0) * (n - 3.0))
+                out[j, 4] = n * (n + 1.0) * (n - 1.0) * M4 / denominator - adj
+    return out
+
+@njit(parallel=True, cache=True)
+def pearson_matrix(X):
+    """Pearson correlation matrix of the columns of a 2-D float64 array.
+
+    Like DataFrame.corr(), each pair uses the rows where both values are present
+    (and, as everywhere else here, finite), and pairs without variance are NaN.
+    """
+    n_rows, n_cols = X.shape
+    out = np.empty((n_cols, n_cols))
+    for i in prange(n_cols):
+        for j in range(i, n_cols):
+            n = 0
+            sum_x = 0.0
+            sum_y = 0.0
+            for r in range(n_rows):
+                x = X[r, i]
+                y = X[r, j]
+                if not (np.isfinite(x) and np.isfinite(y)):
+                    continue
+                n += 1
+                sum_x += x
+                sum_y += y
+            corr = np.nan
+            if n > 0:
+                mean_x = sum_x / n
+                mean_y = sum_y / n
+                ss_x = 0.0
+                ss_y = 0.0
+                ss_xy = 0.0
+                for r in range(n_rows):
+                    x = X[r, i]
+                    y = X[r, j]
+                    if not (np.isfinite(x) and np.isfinite(y)):
+                        continue
+                    dx = x - mean_x
+                    dy = y - mean_y
+                    ss_x += dx * dx
+                    ss_y += dy * dy
+                    ss_xy += dx * dy
+                divisor = np.sqrt(ss_x * ss_y)
+                if divisor != 0.0:
+                    corr = ss_xy / divisor
+            out[i, j] = corr
+            out[j, i] = corr
+    return out
+
+@njit(cache=True, fastmath=True)
+def exponential_smoothing(data, alpha):
+    """Simple exponential smoothing: s[0] = x[0], s[i] = alpha * x[i] + (1 - alpha) * s[i-1]."""
+    smoothed = np.empty_like(data)
+    smoothed[0] = data[0]
+    for i in range(1, data.shape[0]):
+        smoothed[i] = alpha * data[i] + (1.0 - alpha) * smoothed[i - 1]
+    return smoothed
+
+# Compile (or load from the on-disk cache) at import so the first forecast doesn't pay for it
+exponential_smoothing(np.zeros(2), 0.3)
+
+@njit(cache=True, error_model='numpy')
+def simple_ols(x, y):
+    """Least-squares fit of y = intercept + slope * x on paired float64 arrays.
+
+    Returns (n, intercept, slope, r_squared, f_stat, se_intercept, se_slope) from one
+    pass for the means, one for the centred cross-products and one for the
+    residuals (so near-exact fits keep their precision). Degenerate input
+    yields NaN/inf rather than raising; callers should require n >= 3 and a
+    non-constant x.
+    """
+    n = x.shape[0]
+    x_mean = 0.0
+    y_mean = 0.0
+    for i in range(n):
+        x_mean += x[i]
+        y_mean += y[i]
+    x_mean /= n
+    y_mean /= n
+    Sxx = 0.0
+    Sxy = 0.0
+    Syy = 0.0
+    for i in range(n):
+        dx = x[i] - x_mean
+        dy = y[i] - y_mean
+        Sxx += dx * dx
+        Sxy += dx * dy
+        Syy += dy * dy
+    slope = Sxy / Sxx
+    intercept = y_mean - slope * x_mean
+    ss_res = 0.0
+    for i in range(n):
+        r = y[i] - (intercept + slope * x[i])
+        ss_res += r * r
+    s2 = ss_res / (n - 2)
+    return (n, intercept, slope, 1.0 - ss_res / Syy, (Syy - ss_res) / s2,
+            np.sqrt(s2 * (1.0 / n + x_mean * x_mean / Sxx)), np.sqrt(s2 / Sxx))
+
+def dagostino_k2(n: float, skewness: float, kurtosis: float):
+    """D'Agostino-Pearson omnibus test from the biased sample skewness and excess kurtosis.
+
+    Same transforms as scipy.stats.skewtest/kurtosistest/normaltest, but taking
+    the moments as inputs instead of rescanning the data. Needs n >= 20.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Skewness -> approximately standard normal Z (D'Agostino 1970)
+        y = skewness * np.sqrt((n + 1) * (n + 3) / (6.0 * (n - 2)))
+        beta2 = (3.0 * (n * n + 27 * n - 70) * (n + 1) * (n + 3)
+                 / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9)))
+        W2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(W2))
+        alpha = np.sqrt(2.0 / (W2 - 1))
+        y = 1.0 if y == 0 else y
+        z_skew = delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+        
+        # Kurtosis -> approximately standard normal Z (Anscombe & Glynn 1983)
+        b2 = kurtosis + 3.0
+        E = 3.0 * (n - 1) / (n + 1)
+        varb2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) * (n + 1.0) * (n + 3) * (n + 5))
+        x = (b2 - E) / np.sqrt(varb2)
+        sqrtbeta1 = (6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9))
+                     * np.sqrt(6.0 * (n + 3) * (n + 5) / (n * (n - 2) * (n - 3))))
+        A = 6.0 + 8.0 / sqrtbeta1 * (2.0 / sqrtbeta1 + np.sqrt(1 + 4.0 / sqrtbeta1 ** 2))
+        denom = 1 + x * np.sqrt(2 / (A - 4.0))
+        term2 = np.nan if denom == 0.0 else np.sign(denom) * ((1 - 2.0 / A) / abs(denom)) ** (1 / 3.0)
+        z_kurt = (1 - 2 / (9.0 * A) - term2) / np.sqrt(2 / (9.0 * A))
+    
+    k2 = z_skew * z_skew + z_kurt * z_kurt
+    return k2, np.exp(-0.5 * k2)  # chi-squared(2) survival function
+
+def one_sample_t(values: np.ndarray, mu0: float, alpha: float):
+    """Student's one-sample t-test plus the (1 - alpha) confidence interval for the mean.
+
+    Same results as stats.ttest_1samp / stats.t.interval, computed from one mean and
+    one standard deviation without scipy.stats' per-call validation overhead.
+    """
+    n = len(values)
+    mean = values.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se = values.std(ddof=1) / np.sqrt(n)
+        t_stat = (mean - mu0) / se
+    p_value = 2.0 * special.stdtr(n - 1, -abs(t_stat))
+    margin = special.stdtrit(n - 1, 1.0 - alpha / 2.0) * se
+    return t_stat, p_value, mean, (mean - margin, mean + margin)
+
 # ============= GLOBAL DATA STORE =============
-data_store: Dict[str, pd.DataFrame] = {}
+
+# Uploads live on disk so every uvicorn worker sharing DATA_DIR can serve them;
+# data_store only caches the handles (and their summaries) a worker has opened.
+# Files expire DATASET_TTL seconds after upload; per worker, at most
+# DATASET_CACHE_SIZE handles stay resident and their cached arrays and tables
+# are held to DATASET_CACHE_MB in total.
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(tempfile.gettempdir(), "statanalyzer"))
+os.makedirs(DATA_DIR, exist_ok=True)
+DATA_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+DATASET_TTL = float(os.environ.get("DATASET_TTL", 3600))
+DATASET_CACHE_SIZE = int(os.environ.get("DATASET_CACHE_SIZE", 16))
+DATASET_CACHE_MB = float(os.environ.get("DATASET_CACHE_MB", 512))
+
+@dataclass(eq=False)
+class Dataset:
+    """An uploaded table persisted to Parquet, plus the summaries derived from it.
+
+    Only the file path and column metadata stay resident; endpoints read back
+    just the columns they need through a memory map. Uploads are never modified
+    in place, so the summary tables in ``frames``, the float64 views in
+    ``numpy_view`` and the group codes in ``group_view`` are cached on first
+    access and reused. ``nbytes`` is a running total of what those caches
+    hold, updated as entries are added.
+    """
+    path: str
+    rows: int
+    columns: Tuple[str, ...]
+    numeric_cols: Tuple[str, ...]
+    categorical_cols: Tuple[str, ...]
+    float32_cols: Tuple[str, ...]
+    numpy_view: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    group_view: Dict[str, Tuple[np.ndarray, pd.Index]] = field(default_factory=dict, repr=False)
+    frames: Dict[str, pd.DataFrame] = field(default_factory=dict, repr=False)
+    nbytes: int = field(default=0, repr=False)
+    _locks: Dict[str, threading.Lock] = field(default_factory=dict, repr=False)
+    _cache_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @staticmethod
+    def path_for(data_id: str) -> str:
+        return os.path.join(DATA_DIR, f"{data_id}.parquet")
+
+    @classmethod
+    def from_frame(cls, data_id: str, df: pd.DataFrame) -> "Dataset":
+        path = cls.path_for(data_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            try:
+                df.to_parquet(tmp_path, compression="zstd", index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Spreadsheet columns mixing numbers and text have no Arrow type
+                for col in df.select_dtypes(include=['object', 'category']).columns:
+                    df[col] = df[col].astype(str).where(df[col].notna(), None)
+                df.to_parquet(tmp_path, compression="zstd", index=False)
+            # Publish atomically so other workers never see a partially written file
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Nothing sweeps *.tmp files, so never leave a failed write behind
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return cls.open(data_id)
+
+    @classmethod
+    def open(cls, data_id: str) -> "Dataset":
+        """Reopen a persisted upload from its Parquet footer, without reading any data."""
+        path = cls.path_for(data_id)
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        schema = parquet_file.schema_arrow
+        return cls(
+            path=path,
+            rows=parquet_file.metadata.num_rows,
+            columns=tuple(schema.names),
+            numeric_cols=tuple(f.name for f in schema
+                               if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)),
+            categorical_cols=tuple(f.name for f in schema
+                                   if pa.types.is_string(f.type) or pa.types.is_large_string(f.type)
+                                   or pa.types.is_dictionary(f.type)),
+            float32_cols=tuple(f.name for f in schema if f.type == pa.float32()),
+        )
+
+    def load(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        if columns is not None:
+            if not set(columns) <= set(self.columns):
+                raise HTTPException(status_code=400, detail="Column not found")
+            columns = list(columns)
+        df = pq.read_table(self.path, columns=columns, memory_map=True).to_pandas()
+        # Columns narrowed to float32 on upload are stored compactly but computed on in float64
+        narrowed = [col for col in self.float32_cols if col in df.columns]
+        if narrowed:
+            df[narrowed] = df[narrowed].astype(np.float64)
+        return df
+
+    def array(self, column: str) -> np.ndarray:
+        """One numeric column as float64 with NaN for missing values, read straight from Arrow."""
+        arr = self.numpy_view.get(column)
+        if arr is None:
+            if column not in self.numeric_cols:
+                raise HTTPException(status_code=400, detail="Numeric column not found")
+            chunked = pq.read_table(self.path, columns=[column], memory_map=True).column(0)
+            arr = np.ascontiguousarray(chunked.to_numpy(), dtype=np.float64)
+            arr = self._remember(self.numpy_view, column, arr, arr.nbytes)
+        return arr
+
+    def values(self, column: str) -> np.ndarray:
+        """Finite values of one numeric column as float64."""
+        return finite(self.array(column))
+
+    def groups(self, column: str) -> Tuple[np.ndarray, pd.Index]:
+        """Integer group codes of any column (-1 for missing) and the sorted labels they index."""
+        view = self.group_view.get(column)
+        if view is None:
+            codes, labels = pd.factorize(self.load([column])[column], sort=True)
+            view = self._remember(self.group_view, column, (codes, labels),
+                                  codes.nbytes + labels.memory_usage(deep=True))
+        return view
+
+    def _remember(self, cache: Dict[str, Any], key: str, value: Any, size: int) -> Any:
+        # All cache writes go through here so nbytes stays exact; if another
+        # thread cached the same key first, keep (and count) only its value
+        with self._cache_lock:
+            existing = cache.get(key)
+            if existing is not None:
+                return existing
+            cache[key] = value
+            self.nbytes += int(size)
+        return value
+
+    def _memo(self, name: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        # Per-dataset, per-table lock: concurrent requests for the same table wait
+        # for one computation, while other datasets (and functools.cached_property's
+        # class-wide lock on 3.11) never get in the way
+        frame = self.frames.get(name)
+        if frame is None:
+            with self._locks.setdefault(name, threading.Lock()):
+                frame = self.frames.get(name)
+                if frame is None:
+                    frame = compute()
+                    frame = self._remember(self.frames, name, frame, frame.memory_usage(deep=True).sum())
+        return frame
+
+    @property
+    def summary(self) -> pd.DataFrame:
+        return self._memo("summary", self._summary_frame)
+
+    @property
+    def corr(self) -> pd.DataFrame:
+        return self._memo("corr", self._corr_frame)
+
+    def _summary_frame(self) -> pd.DataFrame:
+        """describe()-style table plus variance, skewness and kurtosis per numeric column.
+
+        Moments and extrema come from one kernel pass; quartiles from one
+        nanquantile call over the whole block. Infinite values are skipped like
+        missing ones, matching what finite() hands the other endpoints.
+        """
+        X = np.asfortranarray(self.load(self.numeric_cols).to_numpy(dtype=np.float64))
+        moments = column_moments(X)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns yield NaN
+            # X may be a read-only view of the frame's block: mask into a new array
+            quartiles = np.nanquantile(np.where(np.isinf(X), np.nan, X), [0.25, 0.5, 0.75], axis=0)
+        return pd.DataFrame({
+            'count': moments[:, 0],
+            'mean': moments[:, 1],
+            'std': np.sqrt(moments[:, 2]),
+            'min': moments[:, 5],
+            '25%': quartiles[0],
+            '50%': quartiles[1],
+            '75%': quartiles[2],
+            'max': moments[:, 6],
+            'variance': moments[:, 2],
+            'skewness': moments[:, 3],
+            'kurtosis': moments[:, 4],
+        }, index=list(self.numeric_cols))
+
+    def _corr_frame(self) -> pd.DataFrame:
+        numeric = self.load(self.numeric_cols)
+        matrix = pearson_matrix(np.asfortranarray(numeric.to_numpy(dtype=np.float64)))
+        return pd.DataFrame(matrix, index=list(self.numeric_cols), columns=list(self.numeric_cols))
+
+class DatasetStore:
+    """Thread-safe LRU of open Dataset handles over the TTL-bounded files in DATA_DIR.
+
+    Handles are evicted oldest-first once there are more than ``maxsize`` of
+    them or their caches hold more than ``max_bytes``. Caches fill lazily
+    after a handle is handed out, so the byte budget is re-checked on every
+    lookup. Eviction only drops the cached arrays and summaries; the file
+    stays and is reopened on demand. Expiry removes the file itself, so every
+    worker sharing DATA_DIR sees it disappear.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._handles: "OrderedDict[str, Dataset]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expired(self, path: str, now: float) -> bool:
+        try:
+            return now - os.path.getmtime(path) > self.ttl
+        except FileNotFoundError:
+            return True
+
+    def _discard(self, data_id: str) -> None:
+        self._handles.pop(data_id, None)
+        try:
+            os.remove(Dataset.path_for(data_id))
+        except FileNotFoundError:
+            pass
+
+    def get(self, data_id: str) -> Optional[Dataset]:
+        if not DATA_ID_PATTERN.fullmatch(data_id):
+            return None
+        path = Dataset.path_for(data_id)
+        with self._lock:
+            if self._expired(path, time.time()):
+                self._discard(data_id)
+                return None
+            ds = self._handles.get(data_id)
+            if ds is None:
+                # Possibly uploaded through another worker
+                try:
+                    ds = Dataset.open(data_id)
+                except FileNotFoundError:  # expired by another worker meanwhile
+                    return None
+                self._insert(data_id, ds)
+            else:
+                self._handles.move_to_end(data_id)
+                self._evict(keep=data_id)
+            return ds
+
+    def __setitem__(self, data_id: str, ds: Dataset) -> None:
+        with self._lock:
+            self.purge()
+            self._insert(data_id, ds)
+
+    def _insert(self, data_id: str, ds: Dataset) -> None:
+        self._handles[data_id] = ds
+        self._handles.move_to_end(data_id)
+        self._evict(keep=data_id)
+
+    @property
+    def cached_bytes(self) -> int:
+        with self._lock:
+            return sum(ds.nbytes for ds in self._handles.values())
+
+    def _evict(self, keep: str) -> None:
+        # The handle being served is never evicted, even if it alone exceeds the budget.
+        # nbytes is a running counter, so this never walks the handles' caches
+        total = self.cached_bytes
+        while len(self._handles) > 1 and (len(self._handles) > self.maxsize or total > self.max_bytes):
+            oldest = next(iter(self._handles))
+            if oldest == keep:
+                break
+            total -= self._handles.pop(oldest).nbytes
+
+    def purge(self) -> None:
+        """Delete every upload in DATA_DIR older than the TTL."""
+        now = time.time()
+        with self._lock:
+            for name in os.listdir(DATA_DIR):
+                data_id, ext = os.path.splitext(name)
+                if ext == ".parquet" and self._expired(os.path.join(DATA_DIR, name), now):
+                    self._discard(data_id)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Anonymous metadata for every live upload, whether or not this worker holds it open.
+
+        data_ids are deliberately left out: knowing one is all it takes to read
+        an upload.
+        """
+        now = time.time()
+        entries = []
+        with self._lock:
+            self.purge()
+            for name in os.listdir(DATA_DIR):
+                data_id, ext = os.path.splitext(name)
+                if ext != ".parquet":
+                    continue
+                path = os.path.join(DATA_DIR, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                ds = self._handles.get(data_id)
+                entries.append({
+                    "size_bytes": stat.st_size,
+                    "age_seconds": round(now - stat.st_mtime, 1),
+                    "expires_in_seconds": round(self.ttl - (now - stat.st_mtime), 1),
+                    "loaded": ds is not None,
+                    "rows": ds.rows if ds is not None else None,
+                    "columns": len(ds.columns) if ds is not None else None,
+                    "cached_bytes": ds.nbytes if ds is not None else 0,
+                })
+        entries.sort(key=lambda entry: entry["age_seconds"])
+        return entries
+
+data_store = DatasetStore(maxsize=DATASET_CACHE_SIZE, max_bytes=int(DATASET_CACHE_MB * 2**20), ttl=DATASET_TTL)
+
+def get_dataset(data_id: str) -> Dataset:
+    ds = data_store.get(data_id)
+    if ds is None:
+        raise HTTPException(status_code=404, detail="Data not found")
+    return ds
+
+def unique_column_names(names) -> List[str]:
+    """Column names as pandas' CSV reader would produce them: blanks become
+    'Unnamed: <i>' and repeats get '.1', '.2', ... suffixes."""
+    seen = set()
+    unique = []
+    for i, name in enumerate(names):
+        name = str(name) or f"Unnamed: {i}"
+        base, suffix = name, 0
+        while name in seen:
+            suffix += 1
+            name = f"{base}.{suffix}"
+        seen.add(name)
+        unique.append(name)
+    return unique
+
+def arrow_to_frame(table: pa.Table) -> pd.DataFrame:
+    # Undecodable text comes back as raw bytes, which can be neither analysed nor
+    # serialised; refuse it before anything is persisted
+    if any(pa.types.is_binary(t) or pa.types.is_large_binary(t) for t in table.schema.types):
+        raise HTTPException(status_code=400, detail="Text columns must be UTF-8 encoded")
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+def read_csv_file(source: BinaryIO) -> pd.DataFrame:
+    """Parse a binary CSV stream with PyArrow's multi-threaded reader (no UTF-8 decode copy).
+
+    Results match what pd.read_csv used to give: date/time-like text stays text,
+    and ragged files fall back to pandas, which pads short rows with NaN.
+    """
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=2 << 20)
+    try:
+        table = pacsv.read_csv(source, read_options=read_options,
+                               convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+        temporal = [f.name for f in table.schema if pa.types.is_temporal(f.type)]
+        if temporal:
+            source.seek(0)
+            table = pacsv.read_csv(source, read_options=read_options, convert_options=pacsv.ConvertOptions(
+                strings_can_be_null=True, column_types={name: pa.string() for name in temporal}))
+    except pa.ArrowInvalid:
+        source.seek(0)
+        try:
+            return pd.read_csv(source)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Text columns must be UTF-8 encoded")
+        except pd.errors.ParserError as e:
+            raise HTTPException(status_code=400, detail=f"Malformed CSV: {e}")
+    return arrow_to_frame(table)
+
+def read_parquet_file(source: BinaryIO) -> pd.DataFrame:
+    return arrow_to_frame(pq.read_table(source))
+
+def read_feather_file(source: BinaryIO) -> pd.DataFrame:
+    return arrow_to_frame(feather.read_table(source))
+
+# Leading magic bytes of the binary formats we accept; anything else is only
+# parsed (as CSV) when the file name says so
+FILE_SIGNATURES: List[Tuple[bytes, Callable[[BinaryIO], pd.DataFrame]]] = [
+    (b"PAR1", read_parquet_file),
+    (b"ARROW1", read_feather_file),
+    (b"PK\x03\x04", pd.read_excel),  # .xlsx is a zip archive
+    (b"\xd0\xcf\x11\xe0", pd.read_excel),  # legacy .xls (OLE2 compound file)
+]
+
+def sniff_parser(source: BinaryIO, filename: str) -> Optional[Callable[[BinaryIO], pd.DataFrame]]:
+    """Pick a parser from the upload's first bytes, falling back to the extension for CSV."""
+    head = source.read(8)
+    source.seek(0)
+    for magic, parse in FILE_SIGNATURES:
+        if head.startswith(magic):
+            return parse
+    if filename.endswith('.csv'):
+        return read_csv_file
+    return None
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Narrow numeric columns to the smallest dtype that still holds every value exactly."""
+    for col in df.select_dtypes(include=[np.integer]).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include=[np.floating]).columns:
+        with np.errstate(over='ignore'):
+            narrowed = df[col].astype(np.float32)
+        if np.array_equal(narrowed.to_numpy(dtype=np.float64), df[col].to_numpy(), equal_nan=True):
+            df[col] = narrowed
+    return df
+
+def encode_categoricals(df: pd.DataFrame, max_ratio: float = 0.5) -> pd.DataFrame:
+    """Store repetitive text columns as pandas categoricals (integer codes + labels)."""
+    if len(df) == 0:
+        return df
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if df[col].nunique() / len(df) < max_ratio:
+            df[col] = df[col].astype('category')
+    return df
+
+def ingest_upload(data_id: str, source: BinaryIO, filename: str) -> Tuple[pd.DataFrame, Dataset]:
+    """Parse an upload straight from Starlette's spooled file and persist it as a Dataset."""
+    parse = sniff_parser(source, filename)
+    if parse is None:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    df = parse(source)
+    df.columns = unique_column_names(df.columns)
+    df = encode_categoricals(downcast_numeric(df))
+    ds = data_store[data_id] = Dataset.from_frame(data_id, df)
+    return df, ds
+
+def preview_records(df: pd.DataFrame, rows: int = 10, max_columns: int = 20,
+                    max_chars: int = 200) -> List[Dict[str, Any]]:
+    """First rows of the leftmost columns, with long text cells truncated."""
+    records = df.iloc[:rows, :max_columns].to_dict('records')
+    return [
+        {k: v[:max_chars] if isinstance(v, str) and len(v) > max_chars else v for k, v in rec.items()}
+        for rec in records
+    ]
 
 # ============= PYDANTIC MODELS =============
 
@@ -79,92 +748,86 @@ class ForecastRequest(BaseModel):
 async def health_check():
     return {"status": "healthy", "version": "3.0.0", "timestamp": datetime.now().isoformat()}
 
+@app.get("/api/datasets")
+def list_datasets():
+    return {
+        "ttl_seconds": data_store.ttl,
+        "max_loaded": data_store.maxsize,
+        "max_cached_bytes": data_store.max_bytes,
+        "cached_bytes": data_store.cached_bytes,
+        "datasets": data_store.describe(),
+    }
+
 @app.post("/api/upload")
 async def upload_data(file: UploadFile = File(...)):
     try:
-        contents = await file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(StringIO(contents.decode('utf-8')))
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(BytesIO(contents))
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-        
-        data_id = base64.urlsafe_b64encode(f"{file.filename}_{datetime.now().timestamp()}".encode()).decode()[:16]
-        data_store[data_id] = df
-        
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        data_id = secrets.token_urlsafe(12)
+        # Format sniffing, parsing, dtype narrowing and the Parquet write are all
+        # CPU/disk bound; do them in one worker-thread hop so the event loop stays free
+        df, ds = await run_in_threadpool(ingest_upload, data_id, file.file, file.filename)
         
         return {
             "data_id": data_id,
             "filename": file.filename,
             "rows": len(df),
             "columns": len(df.columns),
-            "numeric_columns": numeric_cols,
-            "categorical_columns": categorical_cols,
-            "preview": df.head(10).to_dict('records')
+            "numeric_columns": ds.numeric_cols,
+            "categorical_columns": ds.categorical_cols,
+            "preview": preview_records(df)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/statistics/{data_id}")
-async def get_statistics(data_id: str):
-    if data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
-    
-    df = data_store[data_id]
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+def get_statistics(data_id: str):
+    ds = get_dataset(data_id)
+    numeric_cols = ds.numeric_cols
     
     if not numeric_cols:
         raise HTTPException(status_code=400, detail="No numeric columns found")
     
-    desc_stats = df[numeric_cols].describe().T
-    desc_stats['variance'] = df[numeric_cols].var()
-    desc_stats['skewness'] = df[numeric_cols].skew()
-    desc_stats['kurtosis'] = df[numeric_cols].kurtosis()
-    
-    box_data = []
-    for col in numeric_cols[:5]:
-        values = df[col].dropna().tolist()
-        box_data.append({
-            "name": col,
-            "min": float(np.min(values)),
-            "q1": float(np.percentile(values, 25)),
-            "median": float(np.median(values)),
-            "q3": float(np.percentile(values, 75)),
-            "max": float(np.max(values)),
-        })
+    desc_stats = ds.summary
+    
+    # The box plots reuse the summary's five-number columns
+    box_data = [
+        {"name": col, "min": q[0], "q1": q[1], "median": q[2], "q3": q[3], "max": q[4]}
+        for col, q in zip(numeric_cols[:5],
+                          desc_stats[['min', '25%', '50%', '75%', 'max']].to_numpy()[:5].tolist())
+    ]
     
     hist_col = numeric_cols[0]
-    hist, bin_edges = np.histogram(df[hist_col].dropna(), bins=30)
+    hist, bin_edges = np.histogram(ds.values(hist_col), bins=30)
     histogram_data = [
-        {"bin": f"{bin_edges[i]:.2f}-{bin_edges[i+1]:.2f}", "count": int(hist[i])}
-        for i in range(len(hist))
+        {"bin": f"{lo:.2f}-{hi:.2f}", "count": count}
+        for lo, hi, count in zip(bin_edges[:-1].tolist(), bin_edges[1:].tolist(), hist.tolist())
     ]
     
-    return {
+    # Returned as a response object so FastAPI skips jsonable_encoder's recursive
+    # walk of the payload; orjson serialises the floats directly
+    return ORJSONResponse({
         "summary": desc_stats.reset_index().to_dict('records'),
         "box_plot_data": box_data,
         "histogram_data": {
             "column": hist_col,
             "data": histogram_data
         }
-    }
+    })
 
 # ============= BUSINESS INTELLIGENCE ENDPOINTS =============
 
 @app.post("/api/business/kpis")
-async def get_business_kpis(request: BusinessMetricsRequest):
-    if request.data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
+def get_business_kpis(request: BusinessMetricsRequest):
+    ds = get_dataset(request.data_id)
+    has_cost = bool(request.cost_column) and request.cost_column in ds.columns
     
-    df = data_store[request.data_id]
-    
-    revenue = float(df[request.revenue_column].sum())
-    avg_order = float(df[request.revenue_column].mean())
-    count = int(len(df))
+    # Same finite values every other endpoint works from
+    revenue_values = ds.values(request.revenue_column)
+    revenue = float(revenue_values.sum())
+    avg_order = float(revenue_values.mean()) if len(revenue_values) else float('nan')
+    count = ds.rows
     
     kpis = {
         "total_revenue": revenue,
@@ -172,8 +835,8 @@ async def get_business_kpis(request: BusinessMetricsRequest):
         "total_transactions": count,
     }
     
-    if request.cost_column and request.cost_column in df.columns:
-        total_cost = float(df[request.cost_column].sum())
+    if has_cost:
+        total_cost = float(ds.values(request.cost_column).sum())
         profit = revenue - total_cost
         margin = (profit / revenue * 100) if revenue > 0 else 0
         kpis.update({
@@ -185,25 +848,18 @@ async def get_business_kpis(request: BusinessMetricsRequest):
     return kpis
 
 @app.post("/api/business/forecast")
-async def forecast_sales(request: ForecastRequest):
-    if request.data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
-    
-    df = data_store[request.data_id]
-    data = df[request.column].dropna().values
+def forecast_sales(request: ForecastRequest):
+    data = get_dataset(request.data_id).values(request.column)
     
     if len(data) < 3:
         raise HTTPException(status_code=400, detail="Insufficient data for forecasting")
     
     # Simple Exponential Smoothing (Demo logic for investor)
-    alpha = 0.3
-    smoothed = [data[0]]
-    for i in range(1, len(data)):
-        smoothed.append(alpha * data[i] + (1 - alpha) * smoothed[-1])
+    smoothed = exponential_smoothing(data, 0.3)
     
     last_val = smoothed[-1]
     trend = (smoothed[-1] - smoothed[0]) / len(smoothed)
-    forecast = [float(last_val + trend * (i + 1)) for i in range(request.periods)]
+    forecast = (last_val + trend * np.arange(1, request.periods + 1, dtype=np.float64)).tolist()
     
     return {
         "forecast": forecast,
@@ -215,20 +871,15 @@ async def forecast_sales(request: ForecastRequest):
 # ============= HYPOTHESIS TESTING =============
 
 @app.post("/api/hypothesis-test")
-async def hypothesis_test(request: HypothesisTestRequest):
-    if request.data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
-    
-    df = data_store[request.data_id]
-    values = df[request.column].dropna()
-    t_stat, p_value = stats.ttest_1samp(values, request.mu0)
-    ci = stats.t.interval(1 - request.alpha, len(values) - 1, loc=values.mean(), scale=stats.sem(values))
+def hypothesis_test(request: HypothesisTestRequest):
+    values = get_dataset(request.data_id).values(request.column)
+    t_stat, p_value, sample_mean, ci = one_sample_t(values, request.mu0, request.alpha)
     decision = "reject" if p_value < request.alpha else "fail_to_reject"
     
     return {
         "t_statistic": float(t_stat),
         "p_value": float(p_value),
-        "sample_mean": float(values.mean()),
+        "sample_mean": float(sample_mean),
         "sample_size": int(len(values)),
         "confidence_interval": {"lower": float(ci[0]), "upper": float(ci[1])},
         "decision": decision,
@@ -238,127 +889,142 @@ async def hypothesis_test(request: HypothesisTestRequest):
 
 # ============= REGRESSION ANALYSIS =============
 @app.post("/api/regression")
-async def run_regression(request: RegressionRequest):
-    if request.data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
+def run_regression(request: RegressionRequest):
+    ds = get_dataset(request.data_id)
     
-    df = data_store[request.data_id]
-    
-    if request.x_column not in df.columns or request.y_column not in df.columns:
+    if request.x_column not in ds.columns or request.y_column not in ds.columns:
         raise HTTPException(status_code=400, detail="Column not found")
     
-    # Remove NaN values
-    data = df[[request.x_column, request.y_column]].dropna()
-    
-    X = data[request.x_column].values
-    y = data[request.y_column].values
+    # Remove rows where either value is missing or infinite
+    X = ds.array(request.x_column)
+    y = ds.array(request.y_column)
+    complete = np.isfinite(X) & np.isfinite(y)
+    X, y = X[complete], y[complete]
     
-    # Add constant for intercept
-    X = sm.add_constant(X)
+    if len(X) < 3:
+        raise HTTPException(status_code=400, detail="Need at least 3 complete data points")
+    if X.min() == X.max():
+        raise HTTPException(status_code=400, detail="X column is constant")
     
-    # Fit OLS regression
-    model = sm.OLS(y, X).fit()
+    # Fit OLS regression; F is on (1, n - 2) degrees of freedom
+    n, intercept, slope, r_squared, f_stat, se_intercept, se_slope = simple_ols(X, y)
+    adj_r_squared = 1.0 - (1.0 - r_squared) * (n - 1) / (n - 2)
+    p_value = special.fdtrc(1, n - 2, f_stat)
     
     return {
-        "r_squared": float(model.rsquared),
-        "adj_r_squared": float(model.rsquared_adj),
-        "f_statistic": float(model.fvalue),
-        "p_value": float(model.f_pvalue),
+        "r_squared": float(r_squared),
+        "adj_r_squared": float(adj_r_squared),
+        "f_statistic": float(f_stat),
+        "p_value": float(p_value),
         "coefficients": {
-            "intercept": float(model.params[0]),
-            "slope": float(model.params[1])
+            "intercept": float(intercept),
+            "slope": float(slope)
         },
         "std_errors": {
-            "intercept": float(model.bse[0]),
-            "slope": float(model.bse[1])
+            "intercept": float(se_intercept),
+            "slope": float(se_slope)
         }
     }
 
 # ============= ANOVA ANALYSIS =============
 @app.post("/api/anova")
-async def run_anova(request: ANOVARequest):
-    if request.data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
+def run_anova(request: ANOVARequest):
+    ds = get_dataset(request.data_id)
     
-    df = data_store[request.data_id]
-    
-    if request.value_column not in df.columns or request.group_column not in df.columns:
+    if request.value_column not in ds.columns or request.group_column not in ds.columns:
         raise HTTPException(status_code=400, detail="Column not found")
     
-    # Remove NaN values
-    data = df[[request.value_column, request.group_column]].dropna()
+    # Remove rows with a missing group or a missing/infinite value
+    values = ds.array(request.value_column)
+    codes, labels = ds.groups(request.group_column)
+    complete = (codes >= 0) & np.isfinite(values)
+    values, codes = values[complete], codes[complete]
+    
+    # Codes are dense integers from factorize, so per-group counts and sums are
+    # direct bincounts; groups with no complete rows drop out
+    counts = np.bincount(codes, minlength=len(labels))
+    group_codes = np.flatnonzero(counts)
     
-    # Group data by group_column
-    groups = [group_data[request.value_column].values for name, group_data in data.groupby(request.group_column)]
+    if len(group_codes) < 2:
+        raise HTTPException(status_code=400, detail="Need at least 2 groups")
     
-    # Perform one-way ANOVA
-    f_stat, p_value = stats.f_oneway(*groups)
+    # Perform one-way ANOVA: group means from the bincounts, then one pass over
+    # the deviations from each row's group mean
+    with np.errstate(divide='ignore', invalid='ignore'):
+        code_means = np.bincount(codes, weights=values, minlength=len(labels)) / counts
+    means = code_means[group_codes]
+    counts = counts[group_codes]
+    grand_mean = values.mean()
+    df_between = len(counts) - 1
+    df_within = len(values) - len(counts)
+    ss_between = (counts * (means - grand_mean) ** 2).sum()
+    ss_within = ((values - code_means[codes]) ** 2).sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_stat = (ss_between / df_between) / (ss_within / df_within)
+    p_value = stats.f.sf(f_stat, df_between, df_within)
     
-    # Calculate means for each group
-    group_means = {}
-    for name, group_data in data.groupby(request.group_column):
-        group_means[str(name)] = float(group_data[request.value_column].mean())
+    group_means = {str(name): mean for name, mean in zip(labels[group_codes].tolist(), means.tolist())}
     
     return {
         "f_statistic": float(f_stat),
         "p_value": float(p_value),
         "group_means": group_means,
-        "num_groups": len(groups),
+        "num_groups": len(group_codes),
         "interpretation": "Significant difference between groups" if p_value < 0.05 else "No significant difference between groups"
     }
 
 # ============= CORRELATION ANALYSIS =============
 @app.get("/api/correlation/{data_id}")
-async def get_correlation(data_id: str):
-    if data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
-    
-    df = data_store[data_id]
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+def get_correlation(data_id: str, response_format: Literal["full", "matrix"] = Query("full", alias="format")):
+    ds = get_dataset(data_id)
+    numeric_cols = ds.numeric_cols
     
     if len(numeric_cols) < 2:
         raise HTTPException(status_code=400, detail="Need at least 2 numeric columns")
     
-    # Calculate correlation matrix
-    corr_matrix = df[numeric_cols].corr()
-    
-    # Convert to list format for visualization
-    correlation_data = []
-    for i, col1 in enumerate(numeric_cols):
-        for j, col2 in enumerate(numeric_cols):
-            if i < j:  # Only upper triangle to avoid duplicates
-                correlation_data.append({
-                    "col1": col1,
-                    "col2": col2,
-                    "correlation": float(corr_matrix.loc[col1, col2])
-                })
-    
-    return {
+    corr_matrix = ds.corr
+    result = {
+        "columns": numeric_cols,
         "correlation_matrix": corr_matrix.to_dict(),
-        "correlation_pairs": correlation_data
     }
+    if response_format == "matrix":
+        return ORJSONResponse(result)
+    
+    # Convert to list format for visualization (upper triangle only to avoid duplicates)
+    rows, cols = np.triu_indices(len(numeric_cols), k=1)
+    pair_values = corr_matrix.to_numpy()[rows, cols]
+    result["correlation_pairs"] = [
+        {"col1": numeric_cols[i], "col2": numeric_cols[j], "correlation": r}
+        for i, j, r in zip(rows.tolist(), cols.tolist(), pair_values)
+    ]
+    # k^2 entries: bypass jsonable_encoder and hand the payload straight to orjson
+    return ORJSONResponse(result)
 
 # ============= NORMALITY TEST =============
 @app.post("/api/normality-test")
-async def normality_test(request: NormalityTestRequest):
-    if request.data_id not in data_store:
-        raise HTTPException(status_code=404, detail="Data not found")
-    
-    df = data_store[request.data_id]
-    values = df[request.column].dropna()
+def normality_test(request: NormalityTestRequest):
+    values = get_dataset(request.data_id).values(request.column)
     
     if len(values) < 3:
         raise HTTPException(status_code=400, detail="Need at least 3 data points")
     
-    # Shapiro-Wilk test
-    stat, p_value = stats.shapiro(values)
+    # Skewness and Kurtosis (biased, Fisher) from one pass of central moment sums
+    n, _, M2, M3, M4, _, _ = central_sums(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skewness = np.sqrt(n) * M3 / M2 ** 1.5
+        kurtosis = n * M4 / (M2 * M2) - 3.0
     
-    # Additional: Skewness and Kurtosis
-    skewness = stats.skew(values)
-    kurtosis = stats.kurtosis(values)
+    # Shapiro-Wilk's p-value is only accurate up to 5000 points; beyond that the
+    # D'Agostino-Pearson test works straight from the moments above
+    if n > 5000:
+        test_name = "D'Agostino-Pearson K² Test"
+        stat, p_value = dagostino_k2(n, skewness, kurtosis)
+    else:
+        test_name = "Shapiro-Wilk Test"
+        stat, p_value = stats.shapiro(values)
     
     return {
-        "test_name": "Shapiro-Wilk Test",
+        "test_name": test_name,
         "statistic": float(stat),
         "p_value": float(p_value),
         "is_normal": bool(p_value > request.alpha),
@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+import tempfile
+
+import pytest
+
+# main.py reads DATA_DIR at import time; keep test uploads out of the real store
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="statanalyzer-test-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def upload_csv(content: bytes) -> str:
+    response = client.post("/api/upload", files={"file": ("data.csv", io.BytesIO(content), "text/csv")})
+    assert response.status_code == 200, response.text
+    return response.json()["data_id"]
+
+
+@pytest.mark.parametrize("content", [
+    b"a\n1\n2\n3\n4\n",                     # single int column
+    b"a\n1.5\n2.5\n3.5\n",                  # single float column
+    b"a,label\n1.5,x\n2.5,y\n3.5,x\n",      # one numeric column plus text
+    b"a,b\n1.5,2.5\n2.5,3.5\n4.5,1.5\n",    # numeric columns sharing one block
+])
+def test_statistics_single_block_upload(content):
+    data_id = upload_csv(content)
+    response = client.get(f"/api/statistics/{data_id}")
+    assert response.status_code == 200, response.text
+    summary = response.json()["summary"]
+    assert summary[0]["index"] == "a"
+    assert summary[0]["count"] == content.count(b"\n") - 1
+
+
+def test_statistics_skip_infinite_values():
+    data_id = upload_csv(b"a\n1\ninf\n3\n-inf\n4\n")
+    response = client.get(f"/api/statistics/{data_id}")
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["summary"][0]["count"] == 3
+    assert body["box_plot_data"][0]["max"] == 4.0
+
+
+def test_business_kpis_skip_infinite_values():
+    data_id = upload_csv(b"revenue,cost\n10,4\ninf,1\n30,-inf\n,2\n")
+    response = client.post("/api/business/kpis", json={
+        "data_id": data_id, "revenue_column": "revenue", "cost_column": "cost",
+    })
+    assert response.status_code == 200, response.text
+    kpis = response.json()
+    assert kpis["total_revenue"] == 40.0
+    assert kpis["average_order_value"] == 20.0
+    assert kpis["total_cost"] == 7.0
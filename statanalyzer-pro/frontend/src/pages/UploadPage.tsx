@@ -87,7 +87,7 @@ const UploadPage: React.FC<UploadPageProps> = ({ setDataId, setDataInfo }) => {
         >
           <input
             type="file"
-            accept=".csv,.xlsx,.xls"
+            accept=".csv,.xlsx,.xls,.parquet,.feather,.arrow"
             onChange={handleFileChange}
             className="absolute inset-0 w-full h-full opacity-0 cursor-pointer z-10"
             disabled={uploading}
@@ -102,7 +102,7 @@ const UploadPage: React.FC<UploadPageProps> = ({ setDataId, setDataInfo }) => {
             Drop Your Asset Here
           </h3>
           <p className="text-slate-500 mb-8 font-bold text-sm tracking-wide uppercase">
-            CSV, EXCEL (XLSX, XLS) SUPPORTED
+            CSV, EXCEL (XLSX, XLS), PARQUET, FEATHER SUPPORTED
           </p>
 
           {file && (